@@ -1,8 +1,20 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 import matplotlib.dates as mdates
 import seaborn as sns
 import os
+from utils.async_plot import AsyncPlotter
+
+# pyarrow가 설치되어 있으면 멀티스레드 CSV 파서 사용
+try:
+    import pyarrow  # noqa: F401
+    CSV_ENGINE = "pyarrow"
+except ImportError:
+    CSV_ENGINE = "c"
+
+# 그래프 출력 폴더 (이미 있으면 그대로 사용)
+os.makedirs("png", exist_ok=True)
 
 # [수정됨] datasets 폴더 경로 반영
 csv_file = "datasets/Cyberpunk_2077_Steam_Reviews.csv" 
@@ -11,22 +23,25 @@ print(f"Loading {csv_file}...")
 if not os.path.exists(csv_file):
     raise FileNotFoundError(f"원본 데이터가 없습니다: {csv_file}")
 
-df = pd.read_csv(csv_file, usecols=['Rating', 'Date Posted'])
+df = pd.read_csv(csv_file, usecols=['Rating', 'Date Posted'], dtype={'Rating': 'category'}, engine=CSV_ENGINE)
 
 print("Processing data...")
 df['Date Posted'] = pd.to_datetime(df['Date Posted'], format='%m/%d/%Y', errors='coerce')
-df['Is_Positive'] = df['Rating'].apply(lambda x: 1 if x == 'Recommended' else 0)
+# 범주형 코드 비교로 한 번에 계산 (행 단위 apply 제거)
+df['Is_Positive'] = (df['Rating'] == 'Recommended').to_numpy().astype(np.int8)
 df = df.dropna(subset=['Date Posted'])
 
-daily_sentiment = df.groupby('Date Posted')['Is_Positive'].mean().reset_index()
+# 날짜순으로 한 번만 정렬한 뒤 groupby의 추가 정렬은 생략
+df = df.sort_values('Date Posted', kind='mergesort')
+daily_sentiment = df.groupby('Date Posted', sort=False)['Is_Positive'].mean().reset_index()
 daily_sentiment.columns = ['Date', 'Positive_Ratio']
-daily_sentiment = daily_sentiment.sort_values('Date')
-daily_sentiment['Smoothed_Ratio'] = daily_sentiment['Positive_Ratio'].rolling(window=7, min_periods=1).mean()
+# 7일 이동평균 (rolling(window=7, min_periods=1).mean()과 동일한 후행 평균)
+ratios = daily_sentiment['Positive_Ratio'].to_numpy(dtype=np.float64)
+window_counts = np.minimum(np.arange(1, len(ratios) + 1), 7)
+daily_sentiment['Smoothed_Ratio'] = np.convolve(ratios, np.ones(7), mode='full')[:len(ratios)] / window_counts
 
 # 그래프 저장 [수정됨]
 output_img = "png/ground_truth_steam.png"
-if not os.path.exists("png"):
-    os.makedirs("png")
 
 plt.figure(figsize=(15, 6))
 sns.set_theme(style="whitegrid")
@@ -40,10 +55,14 @@ plt.xticks(rotation=45)
 plt.legend()
 plt.tight_layout()
 
-plt.savefig(output_img, dpi=300)
-print(f"Graph saved to '{output_img}'")
+# 그래프는 별도 프로세스에서 저장하고, 그동안 CSV 저장 진행
+async_plotter = AsyncPlotter()
+async_plotter.save(plt.gcf(), output_img, dpi=300)
 
 # CSV 저장 [수정됨]
 daily_sentiment.to_csv("datasets/ground_truth_steam.csv", index=False)
 print("'datasets/ground_truth_steam.csv' 저장 완료")
 
+async_plotter.join()
+print(f"Graph saved to '{output_img}'")
+
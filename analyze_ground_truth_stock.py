@@ -5,6 +5,9 @@ import matplotlib.dates as mdates
 import seaborn as sns
 import os
 
+# 그래프 출력 폴더 (이미 있으면 그대로 사용)
+os.makedirs("png", exist_ok=True)
+
 # [수정됨] datasets 폴더 경로 반영
 steam_csv = "datasets/ground_truth_steam.csv"
 print(f"{steam_csv} 로드 완료")
@@ -24,14 +27,34 @@ end_date_str = max_date.strftime('%Y-%m-%d')
 
 print(f"기간 설정: {start_date_str} ~ {end_date_str}")
 
-# 2. 주가 데이터 다운로드
+# 2. 주가 데이터 다운로드 (동일 티커/기간은 로컬 캐시 재사용)
 TICKER = "CDR.WA"
-print(f"{TICKER} 주가 데이터 다운로드 중...")
-stock_data = yf.download(TICKER, start=start_date_str, end=end_date_str)
+cache_dir = os.path.join("datasets", ".yf_cache")
+cache_path = os.path.join(cache_dir, f"{TICKER}_{start_date_str}_{end_date_str}.csv")
+
+df = None
+if os.path.exists(cache_path):
+    df = pd.read_csv(cache_path, parse_dates=['Date'])
+    if df.empty:
+        # 이전 버전에서 저장된 빈 캐시는 무시하고 다시 다운로드
+        print(f"빈 캐시 무시: {cache_path}")
+        df = None
+    else:
+        print(f"{TICKER} 주가 데이터 캐시 사용: {cache_path}")
+
+if df is None:
+    print(f"{TICKER} 주가 데이터 다운로드 중...")
+    stock_data = yf.download(TICKER, start=start_date_str, end=end_date_str)
+    # yfinance는 다운로드 실패 시 예외 대신 빈 DataFrame을 반환하므로 직접 확인 (빈 결과는 캐시하지 않음)
+    if stock_data is None or stock_data.empty:
+        raise RuntimeError(f"{TICKER} 주가 데이터 다운로드 실패 ({start_date_str} ~ {end_date_str}): 빈 결과")
+
+    df = stock_data[['Close']].reset_index()
+    df.columns = ['Date', 'Stock_Price']
+    df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize(None)
 
-df = stock_data[['Close']].reset_index()
-df.columns = ['Date', 'Stock_Price']
-df['Date'] = pd.to_datetime(df['Date']).dt.tz_localize(None)
+    os.makedirs(cache_dir, exist_ok=True)
+    df.to_csv(cache_path, index=False)
 
 # 4. CSV 저장 [수정됨]
 output_csv = "datasets/ground_truth_stock.csv"
@@ -40,9 +63,6 @@ print(f"주가 데이터 저장 완료: '{output_csv}'")
 
 # 5. 그래프 저장 [수정됨] -> png 폴더
 output_img = "png/ground_truth_stock.png"
-# png 폴더 없으면 생성
-if not os.path.exists("png"):
-    os.makedirs("png")
 
 plt.figure(figsize=(15, 6))
 sns.set_theme(style="whitegrid")
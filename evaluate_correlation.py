@@ -3,11 +3,20 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import pearsonr
 import os
+import math
+
+# numba는 선택 사항 (설치되어 있으면 Pearson 계산을 JIT 컴파일)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 sns.set_theme(style="whitegrid")
 
+# 그래프 출력 폴더 (이미 있으면 그대로 사용)
+os.makedirs("png", exist_ok=True)
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Evaluation Script")
     parser.add_argument("--model_csv", type=str, required=True, help="Path to Model Result CSV")
@@ -26,9 +35,52 @@ def load_ground_truth(path, value_col):
     df['Date'] = pd.to_datetime(df['Date'])
     return df[['Date', value_col]].sort_values('Date')
 
+def fast_pearson(x, y):
+    # 평균 중심화 후 정규화된 내적으로 Pearson 상관계수 계산 (p-value 생략)
+    # 상수 입력은 중심화 후에도 반올림 잔차가 남아 norm이 정확히 0이 되지 않으므로 먼저 직접 검사
+    if x.size == 0 or np.all(x == x[0]) or np.all(y == y[0]):
+        return float('nan')
+    x = x - x.mean()
+    y = y - y.mean()
+    nx = np.linalg.norm(x)
+    ny = np.linalg.norm(y)
+    if nx == 0 or ny == 0:
+        return float('nan')
+    return float(np.dot(x, y) / (nx * ny))
+
+def _pearson_1pass(x, y):
+    # 단일 패스로 Σx, Σy, Σx², Σy², Σxy를 누적하는 계산식 (임시 배열 없음)
+    # 첫 원소 기준으로 이동(shift)하여 상쇄 오차를 줄이고, 상수 입력은 정확히 0 분산이 되도록 함
+    n = x.size
+    if n == 0:
+        return math.nan
+    x0 = x[0]
+    y0 = y[0]
+    sx = sy = sxx = syy = sxy = 0.0
+    for i in range(n):
+        xi = x[i] - x0
+        yi = y[i] - y0
+        sx += xi
+        sy += yi
+        sxx += xi * xi
+        syy += yi * yi
+        sxy += xi * yi
+    num = sxy - sx * sy / n
+    den = math.sqrt(max(sxx - sx * sx / n, 0.0) * max(syy - sy * sy / n, 0.0))
+    return num / den if den > 0 else math.nan
+
+pearson_1pass = njit(fastmath=True, cache=True)(_pearson_1pass) if njit is not None else None
+
+def pearson_corr(x, y):
+    # numba가 있으면 JIT 커널, 없으면 NumPy 내적 버전 사용
+    if pearson_1pass is not None:
+        return float(pearson_1pass(x, y))
+    return fast_pearson(x, y)
+
 def calculate_model_ratio(df_model, model_type):
     # YES/NO Parsing (Robust)
-    df_model['Vote'] = df_model['Decision'].apply(lambda x: 1 if str(x).strip().upper().startswith('YES') else 0)
+    votes = df_model['Decision'].astype('string').str.strip().str.upper().str.startswith('YES')
+    df_model['Vote'] = votes.fillna(False).astype(np.int8)
     
     if model_type == 'static':
         ratio = df_model['Vote'].mean()
@@ -41,6 +93,16 @@ def calculate_model_ratio(df_model, model_type):
         daily_ratio.columns = ['Date', 'Purchase_Ratio']
         return None, daily_ratio
 
+def match_nearest_date(dynamic_df, gt_df):
+    # Dynamic 모델의 각 시뮬레이션 날짜를 ±1일 이내의 가장 가까운 GT 날짜와 매칭
+    # (예: 주말 시뮬레이션 날짜도 전후 거래일 주가와 매칭됨). 매칭되지 않은 날짜는 제외
+    # 두 입력 모두 Date 기준 정렬되어 있으므로 merge_asof의 선형 스캔으로 처리
+    left = dynamic_df.assign(Date=dynamic_df['Date'].astype('datetime64[ns]')).sort_values('Date')
+    right = gt_df.assign(Date=gt_df['Date'].astype('datetime64[ns]'))
+    merged = pd.merge_asof(left, right, on='Date', direction='nearest', tolerance=pd.Timedelta('1D'))
+    merged = merged.dropna().reset_index(drop=True)
+    return merged.rename(columns={'Purchase_Ratio': 'Model_Ratio'})
+
 def main():
     args = parse_args()
     print(f"--- Model Evaluation: {args.model_name} ({args.type}) ---")
@@ -58,22 +120,19 @@ def main():
         merged_stock['Model_Ratio'] = static_ratio
         print(f"   [Info] Static Ratio: {static_ratio:.4f}")
     else:
-        merged_steam = pd.merge(steam_gt, dynamic_df, on='Date', how='inner')
-        merged_steam.rename(columns={'Purchase_Ratio': 'Model_Ratio'}, inplace=True)
-        merged_stock = pd.merge(stock_gt, dynamic_df, on='Date', how='inner')
-        merged_stock.rename(columns={'Purchase_Ratio': 'Model_Ratio'}, inplace=True)
+        merged_steam = match_nearest_date(dynamic_df, steam_gt)
+        merged_stock = match_nearest_date(dynamic_df, stock_gt)
         print(f"   [Info] Matched Dates: {len(merged_steam)}")
 
     if len(merged_steam) < 2:
         print("Error: Not enough data points to calculate correlation.")
         return
 
-    # Suppress ConstantInputWarning for Static models
-    import warnings
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore")
-        corr_steam, _ = pearsonr(merged_steam['Model_Ratio'], merged_steam['Positive_Ratio'])
-        corr_stock, _ = pearsonr(merged_stock['Model_Ratio'], merged_stock['Stock_Price'])
+    # Static 모델은 분산이 0이므로 NaN 반환
+    corr_steam = pearson_corr(merged_steam['Model_Ratio'].to_numpy(dtype=np.float64),
+                              merged_steam['Positive_Ratio'].to_numpy(dtype=np.float64))
+    corr_stock = pearson_corr(merged_stock['Model_Ratio'].to_numpy(dtype=np.float64),
+                              merged_stock['Stock_Price'].to_numpy(dtype=np.float64))
     
     print("\n" + "="*40)
     print(f"Evaluation Results: [{args.model_name}]")
@@ -103,8 +162,6 @@ def main():
     plt.title(f'{args.model_name} vs Stock (r={corr_stock:.2f})')
     
     # [수정됨] png 폴더에 저장
-    if not os.path.exists("png"):
-        os.makedirs("png")
     save_path = f"png/eval_{args.model_name}_graph.png"
     plt.tight_layout()
     plt.savefig(save_path)
@@ -1,16 +1,23 @@
 import pandas as pd
 import chromadb
-from chromadb.utils import embedding_functions
-from datetime import datetime
+import numpy as np
 import os
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
+
+# 프로젝트 루트 경로 추가 (utils import를 위해)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.embedding_config import get_embedding_function, HNSW_CONFIG
 
 
 # 설정 (Configuration)
 CSV_PATH = os.path.join("datasets", "cyberpunk2077_all_reviews.csv")
 DB_PATH = os.path.join("datasets", "chroma_db")
 COLLECTION_NAME = "cyberpunk2077_reviews"
+USED_COLUMNS = ['ReviewID', 'Review', 'Date Posted', 'Rating', 'Playtime']
+CHUNK_SIZE = 100_000
 
 
 def process_reviews(csv_path):
@@ -20,60 +27,66 @@ def process_reviews(csv_path):
     """
     print(f"Loading data from {csv_path}...")
     try:
-        df = pd.read_csv(csv_path)
+        columns = pd.read_csv(csv_path, nrows=0).columns.tolist()
     except FileNotFoundError:
         print(f"Error: File not found at {csv_path}")
         sys.exit(1)
-        
-    print(f"Total rows: {len(df)}")
     
     # 새로운 데이터셋 컬럼 매핑 확인
     # 'Review' 컬럼 존재 여부 확인
-    if 'Review' not in df.columns:
-        print(f"Error: 'Review' column not found. Columns: {df.columns.tolist()}")
+    if 'Review' not in columns:
+        print(f"Error: 'Review' column not found. Columns: {columns}")
         sys.exit(1)
 
-    # 빈 리뷰 제거
-    df = df.dropna(subset=['Review'])
+    # 청크 단위로 읽으면서 필요한 컬럼만 남기고 빈 리뷰 제거 (전체 CSV를 메모리에 올리지 않음)
+    total_rows = 0
+    chunks = []
+    usecols = [c for c in columns if c in USED_COLUMNS]
+    for chunk in pd.read_csv(csv_path, usecols=usecols, chunksize=CHUNK_SIZE):
+        total_rows += len(chunk)
+        chunks.append(chunk.dropna(subset=['Review']))
+    df = pd.concat(chunks, ignore_index=True)
+    
+    print(f"Total rows: {total_rows}")
     print(f"Rows after dropping empty reviews: {len(df)}")
     
     # 언어 필터링 등을 추가할 수 있으나, 현재 데이터셋은 대부분 영문으로 가정하고 진행
     
     return df
 
-def parse_date_to_int(date_str):
+DATE_FORMATS = [
+    '%m/%d/%Y',      # 12/9/2020
+    '%Y-%m-%d',      # 2020-12-09
+    '%d-%m-%Y',      # 09-12-2020
+    '%B %d, %Y'      # December 9, 2020
+]
+
+def parse_dates_to_int(date_series):
     """
-    날짜 문자열을 YYYYMMDD 정수형으로 변환합니다.
-    'M/D/YYYY' (예: 12/9/2020) 등 다양한 형식을 지원합니다.
+    날짜 문자열 컬럼 전체를 YYYYMMDD 정수형 배열로 변환합니다.
+    'M/D/YYYY' (예: 12/9/2020) 등 다양한 형식을 지원하며,
+    형식별로 컬럼 단위 파싱 후 앞선 형식의 결과를 우선합니다.
+    파싱 실패한 위치는 0으로 채워집니다.
     """
-    if pd.isna(date_str):
-        return None
-        
-    formats = [
-        '%m/%d/%Y',      # 12/9/2020
-        '%Y-%m-%d',      # 2020-12-09
-        '%d-%m-%Y',      # 09-12-2020
-        '%B %d, %Y'      # December 9, 2020
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(str(date_str).strip(), fmt)
-            return int(dt.strftime('%Y%m%d'))
-        except ValueError:
-            continue
-            
-    return None
+    date_strs = date_series.astype("string").str.strip()
+    dates = pd.Series(pd.NaT, index=date_series.index, dtype="datetime64[ns]")
 
+    for fmt in DATE_FORMATS:
+        missing = dates.isna()
+        if not missing.any():
+            break
+        dates[missing] = pd.to_datetime(date_strs[missing], format=fmt, errors='coerce')
+
+    date_int = dates.dt.year * 10000 + dates.dt.month * 100 + dates.dt.day
+    return date_int.fillna(0).astype(np.int64).to_numpy()
 
 
 def build_chroma_db(test_mode=False):
     # ChromaDB 클라이언트 초기화
     client = chromadb.PersistentClient(path=DB_PATH)
     
-    # 임베딩 함수 설정 (all-MiniLM-L6-v2 사용)
-    print("Using default embedding model: all-MiniLM-L6-v2")
-    ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
+    # 임베딩 함수 설정 (검색 측과 동일한 공통 설정 사용)
+    ef = get_embedding_function()
     
     # 스키마 초기화를 위해 항상 기존 컬렉션 삭제
     try:
@@ -82,7 +95,12 @@ def build_chroma_db(test_mode=False):
     except Exception as e:
         print(f"Collection deletion skipped: {e}")
 
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    # HNSW 인덱스 설정을 명시 (cosine 거리: Team 3의 similarity = 1 - distance 계산과 일치)
+    collection = client.create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=ef,
+        metadata=HNSW_CONFIG
+    )
     
     df = process_reviews(CSV_PATH)
     
@@ -93,10 +111,6 @@ def build_chroma_db(test_mode=False):
     batch_size = 512
     total_docs = len(df)
     
-    documents = []
-    metadatas = []
-    ids = []
-    
     print(f"\n{'='*60}")
     print(f"🚀 ChromaDB 구축 시작")
     print(f"{'='*60}")
@@ -106,73 +120,93 @@ def build_chroma_db(test_mode=False):
     print(f"📚 컬렉션명: {COLLECTION_NAME}")
     print(f"{'='*60}\n")
     
-    skipped_count = 0
-    processed_count = 0
+    # 메타데이터 컬럼을 행 단위 루프 없이 한 번에 계산
+    if 'Date Posted' in df.columns:
+        date_ints = parse_dates_to_int(df['Date Posted'])
+    else:
+        date_ints = np.zeros(total_docs, dtype=np.int64)
     
-    for i, (idx, row) in enumerate(df.iterrows()):
-        review_text = row['Review']
-        date_val = row.get('Date Posted')
-        
-        # 날짜 파싱
-        date_int = parse_date_to_int(date_val)
-        if not date_int:
-            # 날짜 파싱 실패 시 건너뜀
-            skipped_count += 1
-            if skipped_count <= 5:
-                print(f"⚠️  날짜 파싱 실패 (건너뜀): Date='{date_val}' (행 {i+1})")
-            continue
-            
-        # 메타데이터 구성
-        # Rating: 'Recommended' -> True, 'Not Recommended' -> False
-        rating_str = str(row.get('Rating', '')).lower()
-        is_positive = 'recommended' in rating_str and 'not' not in rating_str
-        
-        # 플레이 타임 (Playtime)
-        playtime = 0.0
-        try:
-            if 'Playtime' in row:
-                # "10.5 hours" 문자열 등 처리
-                pt_str = str(row['Playtime']).replace('hours', '').strip()
-                playtime = float(pt_str)
-        except:
-            pass
-            
-        metadata = {
-            "date": date_int,
+    # Rating: 'Recommended' -> True, 'Not Recommended' -> False
+    # astype(str)는 pandas 3에서 결측값을 NaN(float)으로 남기므로 원소별 str()로 변환 (결측 -> 'nan')
+    if 'Rating' in df.columns:
+        rating_strs = df['Rating'].astype(object).map(str).str.lower()
+    else:
+        rating_strs = pd.Series('', index=df.index)
+    is_positive = (
+        rating_strs.str.contains('recommended', regex=False)
+        & ~rating_strs.str.contains('not', regex=False)
+    )
+    
+    # 플레이 타임 (Playtime): "10.5 hours" 문자열 등 처리, 실패 시 0.0
+    if 'Playtime' in df.columns:
+        playtimes = pd.to_numeric(
+            df['Playtime'].astype(str).str.replace('hours', '', regex=False).str.strip(),
+            errors='coerce'
+        ).fillna(0.0)
+    else:
+        playtimes = pd.Series(0.0, index=df.index)
+    
+    # ID: ReviewID가 있으면 사용, 없으면 인덱스 사용
+    if 'ReviewID' in df.columns:
+        doc_ids = df['ReviewID'].astype(object).map(str).tolist()
+    else:
+        doc_ids = [f"rev_{i}" for i in range(total_docs)]
+    
+    # 날짜 파싱 실패 시 건너뜀
+    valid = date_ints > 0
+    skipped_count = int((~valid).sum())
+    if skipped_count:
+        date_vals = df.get('Date Posted', pd.Series(None, index=df.index))
+        for pos in np.flatnonzero(~valid)[:5]:
+            print(f"⚠️  날짜 파싱 실패 (건너뜀): Date='{date_vals.iloc[pos]}' (행 {pos+1})")
+    
+    documents_all = df['Review'].to_numpy()[valid].tolist()
+    ids_all = [doc_id for doc_id, ok in zip(doc_ids, valid) if ok]
+    metadatas_all = [
+        {
+            "date": int(date_int),
             "rating": rating_str,
-            "voted_up": is_positive,
-            "playtime": playtime,
+            "voted_up": bool(positive),
+            "playtime": float(playtime),
             "source": "steam_new_dataset"
         }
-        
-        # ID: ReviewID가 있으면 사용, 없으면 인덱스 사용
-        doc_id = str(row['ReviewID']) if 'ReviewID' in row else f"rev_{i}"
-        
-        documents.append(review_text)
-        metadatas.append(metadata)
-        ids.append(doc_id)
-        
-        processed_count += 1
-        
-        if len(documents) >= batch_size:
-            print(f"📥 배치 저장 중... ({processed_count:,}/{total_docs:,} 처리됨, {len(documents)}개 문서 추가)")
-            collection.add(
-                documents=documents,
-                metadatas=metadatas,
-                ids=ids
-            )
-            documents = []
-            metadatas = []
-            ids = []
-            print(f"✅ 저장 완료! 현재 컬렉션 문서 수: {collection.count():,}개\n")
-            
-    if documents:
-        print(f"📥 마지막 배치 저장 중... ({len(documents)}개 문서)")
-        collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            ids=ids
+        for date_int, rating_str, positive, playtime in zip(
+            date_ints[valid],
+            rating_strs.to_numpy()[valid],
+            is_positive.to_numpy()[valid],
+            playtimes.to_numpy()[valid]
         )
+    ]
+    processed_count = len(documents_all)
+    
+    # 임베딩 계산(CPU/GPU)과 DB 쓰기(디스크 I/O)를 겹쳐서 실행:
+    # 현재 배치를 백그라운드 스레드에서 저장하는 동안 다음 배치를 임베딩
+    # (ChromaDB 쓰기는 단일 스레드에서만 수행)
+    pending = None
+    with ThreadPoolExecutor(max_workers=1) as writer:
+        for start in range(0, processed_count, batch_size):
+            end = min(start + batch_size, processed_count)
+            batch_docs = documents_all[start:end]
+            embeddings = ef(batch_docs)
+            
+            if pending is not None:
+                pending.result()
+                print(f"✅ 저장 완료! 현재 컬렉션 문서 수: {collection.count():,}개\n")
+            
+            if end == processed_count:
+                print(f"📥 마지막 배치 저장 중... ({end - start}개 문서)")
+            else:
+                print(f"📥 배치 저장 중... ({end:,}/{total_docs:,} 처리됨, {end - start}개 문서 추가)")
+            pending = writer.submit(
+                collection.add,
+                documents=batch_docs,
+                embeddings=embeddings,
+                metadatas=metadatas_all[start:end],
+                ids=ids_all[start:end]
+            )
+        
+        if pending is not None:
+            pending.result()
     
     print(f"\n{'='*60}")
     print(f"✅ ChromaDB 구축 완료!")
@@ -1,13 +1,15 @@
 import chromadb
+import functools
 import os
+import numpy as np
 import openai
-from chromadb.utils import embedding_functions
 import sys
 
 # 프로젝트 루트 경로 추가 (모듈 import를 위해)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.search_queries import GAMER_TYPE_QUERIES, GENERAL_QUERY
+from utils.embedding_config import get_embedding_function  # 구축/검색 공통 임베딩 모델
 
 # RAG 모듈 (RAG Modules)
 # 이 모듈은 ChromaDB와의 연결 및 검색 로직을 담당합니다.
@@ -30,24 +32,37 @@ def get_chroma_client():
     client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
     return client
 
-def get_embedding_function():
+@functools.lru_cache(maxsize=4096)
+def _date_to_int(date_str):
+    """YYYY-MM-DD -> YYYYMMDD (int). 시뮬레이션 날짜는 반복되므로 결과를 캐시합니다."""
+    return int(date_str.replace("-", ""))
+
+def _format_reviews(docs, date_ints):
     """
-    임베딩 함수를 설정하여 반환합니다.
-    기존 ChromaDB 컬렉션이 'all-MiniLM-L6-v2' (SentenceTransformer)로 생성되었으므로,
-    이를 맞춰서 사용합니다.
-    Returns:
-        embedding_functions.SentenceTransformerEmbeddingFunction: 임베딩 함수 객체
+    검색된 리뷰를 Team 3 스타일 "- [Date] Review..." 형식으로 변환합니다.
     """
-    # OpenAI 대신 로컬 모델 사용 (DB와의 호환성 유지)
-    return embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
+    formatted_results = []
+    for doc, date_int in zip(docs, date_ints):
+        # 정수형 날짜(YYYYMMDD)를 다시 문자열(YYYY-MM-DD)로 변환
+        date_str = str(date_int)
+        if len(date_str) == 8:
+            date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
+        
+        # 리뷰 길이를 400자로 제한 (Team 3와 동일)
+        review_snippet = doc[:400]
+        formatted_results.append(f"- [{date_str}] {review_snippet}...")
+    return formatted_results
 
 class RAGRetriever:
-    def __init__(self):
+    def __init__(self, in_memory_index=False):
         """
         RAGRetriever 초기화
         ChromaDB 클라이언트와 컬렉션을 로드합니다.
+        
+        Args:
+            in_memory_index (bool): True이면 컬렉션의 임베딩을 한 번에 메모리로 읽어와
+                ChromaDB 쿼리 대신 NumPy 행렬 연산으로 검색합니다.
+                (시뮬레이션처럼 검색 호출이 매우 많을 때 사용, 임베딩 크기만큼 메모리 필요)
         """
         self.client = get_chroma_client()
         self.embedding_fn = get_embedding_function()
@@ -62,6 +77,88 @@ class RAGRetriever:
         except Exception as e:
             raise ValueError(f"컬렉션 '{COLLECTION_NAME}'을 로드하는 중 오류가 발생했습니다: {e}")
 
+        # 고정 쿼리(게이머 유형별 쿼리 + GENERAL_QUERY) 임베딩을 한 번에 미리 계산
+        # 시뮬레이션 중 같은 쿼리를 반복해서 임베딩하지 않도록 dict로 보관
+        queries = list(dict.fromkeys(
+            [q for type_queries in GAMER_TYPE_QUERIES.values() for q in type_queries] + [GENERAL_QUERY]
+        ))
+        self._query_emb = dict(zip(queries, self.embedding_fn(queries)))
+        print(f"Precomputed embeddings for {len(self._query_emb)} queries.")
+
+        self._index = None
+        if in_memory_index:
+            self._load_index()
+
+    def _load_index(self, page_size=50_000):
+        """
+        컬렉션 전체(임베딩, 문서, 날짜)를 메모리로 읽어 날짜순으로 정렬해 둡니다.
+        날짜순 정렬 덕분에 "date <= 현재 날짜" 필터는 앞부분 슬라이스 하나로 처리됩니다.
+        
+        임베딩 행렬을 두 벌 들고 있지 않도록 먼저 날짜만 읽어 정렬 순서를 구한 뒤,
+        두 번째 패스에서 각 페이지를 미리 할당한 행렬의 정렬된 위치에 바로 기록합니다.
+        """
+        total = self.collection.count()
+        print(f"Loading {total:,} embeddings into memory...")
+        
+        # 1차: 날짜만 읽어 정렬 순서 계산
+        dates = np.zeros(total, dtype=np.int64)
+        for offset in range(0, total, page_size):
+            page = self.collection.get(include=["metadatas"], limit=page_size, offset=offset)
+            dates[offset:offset + len(page['metadatas'])] = [meta.get('date', 0) for meta in page['metadatas']]
+        order = np.argsort(dates, kind='stable')
+        position = np.empty(total, dtype=np.int64)  # 원래 순번 -> 정렬된 위치
+        position[order] = np.arange(total)
+        
+        # 2차: 임베딩/문서를 정렬된 위치에 기록 (페이지 단위로 정규화)
+        embs = None
+        docs = [None] * total
+        for offset in range(0, total, page_size):
+            page = self.collection.get(
+                include=["embeddings", "documents", "metadatas"],
+                limit=page_size,
+                offset=offset
+            )
+            page_dates = [meta.get('date', 0) for meta in page['metadatas']]
+            if page_dates != dates[offset:offset + len(page_dates)].tolist():
+                raise RuntimeError("인덱스 로드 중 컬렉션 순서가 바뀌었습니다. 다시 실행하세요.")
+            
+            page_embs = np.asarray(page['embeddings'], dtype=np.float32)
+            # 컬렉션이 cosine 공간이므로 정규화 후 내적 = cosine similarity
+            norms = np.linalg.norm(page_embs, axis=1, keepdims=True)
+            page_embs /= np.where(norms == 0, 1, norms)
+            if embs is None:
+                embs = np.empty((total, page_embs.shape[1]), dtype=np.float32)
+            
+            page_pos = position[offset:offset + len(page_embs)]
+            embs[page_pos] = page_embs
+            for pos, doc in zip(page_pos.tolist(), page['documents']):
+                docs[pos] = doc
+        
+        if embs is None:
+            embs = np.zeros((0, 0), dtype=np.float32)
+        self._index = {
+            "embeddings": embs,
+            "dates": dates[order],
+            "documents": docs
+        }
+        print(f"In-memory index ready ({embs.nbytes / 1e6:,.0f} MB).")
+
+    def get_query_embedding(self, query_text):
+        """
+        쿼리 임베딩을 반환합니다. 미리 계산되지 않은 쿼리는 계산 후 캐시합니다.
+        """
+        return self.get_query_embeddings([query_text])[0]
+
+    def get_query_embeddings(self, query_texts):
+        """
+        여러 쿼리의 임베딩을 입력 순서대로 반환합니다.
+        캐시에 없는 쿼리들만 모아 임베딩 함수를 한 번만 호출합니다.
+        """
+        misses = [q for q in dict.fromkeys(query_texts) if q not in self._query_emb]
+        if misses:
+            self._query_emb.update(zip(misses, self.embedding_fn(misses)))
+        return [self._query_emb[q] for q in query_texts]
+
     def retrieve_reviews(self, query_text, current_date, top_k=5):
         """
         주어진 쿼리와 날짜를 기준으로 관련 리뷰를 검색합니다.
@@ -74,47 +171,77 @@ class RAGRetriever:
         Returns:
             list: 검색된 문서(리뷰) 리스트
         """
+        return self.retrieve_reviews_batch([query_text], current_date, top_k=top_k)[0]
+
+    def retrieve_reviews_batch(self, query_texts, current_date, top_k=5):
+        """
+        여러 쿼리를 같은 날짜 기준으로 한 번에 검색합니다.
+        
+        Args:
+            query_texts (list): 검색할 쿼리 텍스트 리스트 (영어)
+            current_date (str): 시뮬레이션 현재 날짜 (YYYY-MM-DD 형식). 이 날짜 이전의 리뷰만 검색됨.
+            top_k (int): 쿼리별로 반환할 상위 결과 개수
+            
+        Returns:
+            list: 쿼리 순서대로 검색된 문서(리뷰) 리스트의 리스트
+        """
         # 날짜 포맷 변환: YYYY-MM-DD -> YYYYMMDD (int)
         # ChromaDB 메타데이터가 int형 날짜로 저장되어 있으므로 이에 맞춰 변환
         try:
-            date_int = int(current_date.replace("-", ""))
+            date_int = _date_to_int(current_date)
         except ValueError:
             print(f"Warning: Invalid date format {current_date}. Using current timestamp.")
             date_int = 20250101 # Fallback
+        
+        query_embs = self.get_query_embeddings(query_texts)
+        
+        if self._index is not None:
+            return self._search_in_memory(query_embs, date_int, top_k)
             
         # 날짜 필터링: 현재 날짜보다 작거나 같은(lte) 데이터만 검색
         where_filter = {"date": {"$lte": date_int}}
         
-        # print(f"Retrieving for query: '{query_text}' with date filter <= {date_int}")
-        
         results = self.collection.query(
-            query_texts=[query_text],
+            query_embeddings=query_embs,
             n_results=top_k,
-            where=where_filter
+            where=where_filter,
+            include=["documents", "metadatas"]  # 사용하지 않는 distances/embeddings는 반환하지 않음
         )
         
-        if results['documents'] and results['documents'][0]:
-            # Team 3 스타일: "- [Date] Review..." 형식으로 변환
-            formatted_results = []
-            
-            # documents[0], metadatas[0]는 리스트 형태임
-            docs = results['documents'][0]
-            metas = results['metadatas'][0]
-            
-            for doc, meta in zip(docs, metas):
-                date_int = meta.get('date', 0)
-                # 정수형 날짜(YYYYMMDD)를 다시 문자열(YYYY-MM-DD)로 변환
-                date_str = str(date_int)
-                if len(date_str) == 8:
-                    date_str = f"{date_str[:4]}-{date_str[4:6]}-{date_str[6:]}"
-                
-                # 리뷰 길이를 400자로 제한 (Team 3와 동일)
-                review_snippet = doc[:400]
-                formatted_results.append(f"- [{date_str}] {review_snippet}...")
-                
-            return formatted_results
-        else:
-            return []
+        if not results['documents']:
+            return [[] for _ in query_texts]
+        
+        # documents[i], metadatas[i]는 i번째 쿼리의 결과 리스트
+        return [
+            _format_reviews(docs, [meta.get('date', 0) for meta in metas])
+            for docs, metas in zip(results['documents'], results['metadatas'])
+        ]
+
+    def _search_in_memory(self, query_embs, date_int, top_k):
+        """
+        메모리 인덱스에서 날짜 필터 + 정확한 cosine top-k 검색을 수행합니다.
+        """
+        index = self._index
+        # 날짜순 정렬되어 있으므로 date <= date_int 인 문서는 [:cut] 구간
+        cut = int(np.searchsorted(index["dates"], date_int, side='right'))
+        if cut == 0:
+            return [[] for _ in query_embs]
+        
+        queries = np.asarray(query_embs, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        
+        # (쿼리 수 x 후보 수) 유사도 행렬을 한 번의 행렬곱으로 계산
+        scores = queries @ index["embeddings"][:cut].T
+        k = min(top_k, cut)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        top = np.take_along_axis(top, np.argsort(-top_scores, axis=1), axis=1)
+        
+        return [
+            _format_reviews([index["documents"][i] for i in row], index["dates"][row].tolist())
+            for row in top
+        ]
 
 if __name__ == "__main__":
     # 테스트 코드 (Test Code)
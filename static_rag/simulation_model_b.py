@@ -1,4 +1,5 @@
 import os
+import argparse
 import sys
 import json
 import pandas as pd
@@ -74,14 +75,15 @@ def call_llm(prompt: str) -> dict:
 # 4. 메인 실행 (Main Execution)
 # =============================================================================
 
-def run_experiment_b_rag(n_per_type: int = 13):
+def run_experiment_b_rag(n_per_type: int = 13, in_memory_index: bool = False):
     print("=" * 70)
     print(f"Task 2: Static RAG Simulation")
     print("=" * 70)
 
     # RAG 검색기 초기화
     print("Initializing RAG Retriever...")
-    retriever = RAGRetriever()
+    # in_memory_index=True: 임베딩을 메모리에 올려 반복 검색을 행렬 연산으로 처리 (임베딩 + 리뷰 전체 크기만큼 메모리 필요)
+    retriever = RAGRetriever(in_memory_index=in_memory_index)
 
     # 날짜 로드
     dates_df = pd.read_csv(SIMULATION_DATES_FILE)
@@ -118,9 +120,8 @@ def run_experiment_b_rag(n_per_type: int = 13):
             # Team 2는 유사도(Similarity) 기반 상위 k개를 검색
             
             candidates = []
-            for query in selected_queries:
-                # retrieve_reviews 함수는 "- [Date] text..." 형식을 반환
-                reviews = retriever.retrieve_reviews(query, date_str, top_k=2)
+            # 선택된 쿼리를 한 번의 배치 검색으로 처리 (쿼리별로 "- [Date] text..." 형식 리스트 반환)
+            for reviews in retriever.retrieve_reviews_batch(selected_queries, date_str, top_k=2):
                 candidates.extend(reviews)
             
             # 중복 제거 (단순 집합 사용)
@@ -167,5 +168,9 @@ def run_experiment_b_rag(n_per_type: int = 13):
     print("=" * 70)
 
 if __name__ == "__main__":
-    # 테스트 실행 (유형별 1명 생성)
-    run_experiment_b_rag(n_per_type=13)
+    parser = argparse.ArgumentParser(description="Team 2: Static RAG Simulation")
+    parser.add_argument("--in-memory-index", action="store_true",
+                        help="컬렉션 전체 임베딩을 메모리에 올려 검색 (빠르지만 전체 리뷰 기준 수 GB 메모리 필요)")
+    args = parser.parse_args()
+    
+    run_experiment_b_rag(n_per_type=13, in_memory_index=args.in_memory_index)
@@ -5,12 +5,12 @@ asyncio + aiohttp를 사용한 비동기 실행으로 속도 향상
 """
 
 import os
+import argparse
 import sys
 import json
 import pandas as pd
 import random
 import asyncio
-from openai import AsyncOpenAI
 
 # 프로젝트 루트 경로 추가
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,7 +19,8 @@ sys.path.append(parent_dir)
 
 from utils.persona_generator import generate_balanced_personas, Persona
 from utils.search_queries import GAMER_TYPE_QUERIES, GENERAL_QUERY
-from utils.llm_config import get_llm_client, TEMPERATURE
+from utils.llm_config import get_async_llm_client, TEMPERATURE, MAX_CONCURRENT
+from utils.async_runner import run_async
 from static_rag.rag_modules import RAGRetriever
 
 # 병렬 토크나이저 경고 억제
@@ -28,21 +29,7 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # 병렬 토크나이저 경고 억제
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-# Async OpenAI 클라이언트 초기화
-def get_async_llm_client():
-    """비동기 LLM 클라이언트 반환"""
-    import os
-    from dotenv import load_dotenv
-    
-    load_dotenv()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in .env file.")
-    
-    client = AsyncOpenAI(api_key=api_key)
-    model_name = "gpt-4o-mini"
-    return client, model_name
-
+# Async OpenAI 클라이언트 초기화 (공통 모듈 사용, 연결 풀 재사용)
 client, MODEL_NAME = get_async_llm_client()
 print(f"✅ Using model: {MODEL_NAME} (Team 2 - Async)")
 
@@ -84,7 +71,7 @@ JSON only:
 # 3. 비동기 API 호출
 # =============================================================================
 
-async def call_llm_async(client: AsyncOpenAI, prompt: str, semaphore: asyncio.Semaphore) -> dict:
+async def call_llm_async(client, prompt: str, semaphore: asyncio.Semaphore) -> dict:
     """비동기 LLM 호출 (동시 실행 수 제한, 재시도 포함)"""
     async with semaphore:
         for attempt in range(3):
@@ -107,7 +94,7 @@ async def call_llm_async(client: AsyncOpenAI, prompt: str, semaphore: asyncio.Se
 # 4. 메인 실행 (비동기)
 # =============================================================================
 
-async def run_experiment_b_rag_async(n_per_type: int = 13, max_concurrent: int = 5):
+async def run_experiment_b_rag_async(n_per_type: int = 13, max_concurrent: int = 5, in_memory_index: bool = False):
     import sys
     sys.stdout.reconfigure(line_buffering=True)  # 즉시 출력
     sys.stderr.reconfigure(line_buffering=True)
@@ -126,7 +113,8 @@ async def run_experiment_b_rag_async(n_per_type: int = 13, max_concurrent: int =
 
     # RAG 검색기 초기화
     print("Initializing RAG Retriever...")
-    retriever = RAGRetriever()
+    # in_memory_index=True: 임베딩을 메모리에 올려 반복 검색을 행렬 연산으로 처리 (임베딩 + 리뷰 전체 크기만큼 메모리 필요)
+    retriever = RAGRetriever(in_memory_index=in_memory_index)
 
     # 날짜 로드
     dates_df = pd.read_csv(SIMULATION_DATES_FILE)
@@ -163,9 +151,10 @@ async def run_experiment_b_rag_async(n_per_type: int = 13, max_concurrent: int =
             # 2~3. ChromaDB 검색 (직렬화)
             async with retrieval_lock:
                 candidates = []
-                for query in selected_queries:
-                    # Run blocking sync DB call in a separate thread to avoid blocking event loop
-                    reviews = await asyncio.to_thread(retriever.retrieve_reviews, query, date_str, top_k=2)
+                # Run blocking sync DB call in a separate thread to avoid blocking event loop
+                # 선택된 쿼리를 한 번의 배치 검색으로 처리
+                batch_reviews = await asyncio.to_thread(retriever.retrieve_reviews_batch, selected_queries, date_str, top_k=2)
+                for reviews in batch_reviews:
                     candidates.extend(reviews)
                 unique_candidates = list(set(candidates))
                 final_docs = unique_candidates[:5]
@@ -265,7 +254,14 @@ async def run_experiment_b_rag_async(n_per_type: int = 13, max_concurrent: int =
 
 def main():
     """메인 함수"""
-    asyncio.run(run_experiment_b_rag_async(n_per_type=13, max_concurrent=20))
+    parser = argparse.ArgumentParser(description="Team 2: Static RAG Simulation (Async)")
+    parser.add_argument("--in-memory-index", action="store_true",
+                        help="컬렉션 전체 임베딩을 메모리에 올려 검색 (빠르지만 전체 리뷰 기준 수 GB 메모리 필요)")
+    args = parser.parse_args()
+    
+    run_async(run_experiment_b_rag_async(
+        n_per_type=13, max_concurrent=MAX_CONCURRENT, in_memory_index=args.in_memory_index
+    ))
 
 if __name__ == "__main__":
     main()
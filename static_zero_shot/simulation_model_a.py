@@ -1,9 +1,16 @@
 import os
 import sys
+import csv
 import json
-import pandas as pd
+import argparse
 import time
-from openai import OpenAI
+import asyncio
+import functools
+import random
+from collections import Counter
+from typing import Literal
+from pydantic import BaseModel
+from openai import RateLimitError, APIConnectionError, InternalServerError, LengthFinishReasonError
 
 # ---------------------------------------------------------------------------
 # 경로 설정 (utils import 및 CSV 저장용)
@@ -14,29 +21,70 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
-from utils.persona_generator import generate_balanced_personas, Persona
-from utils.llm_config import get_llm_client, TEMPERATURE
+from utils.persona_generator import generate_balanced_personas, Persona, GAMER_TYPES
+from utils.llm_config import get_llm_client, get_async_llm_client, TEMPERATURE, USE_OLLAMA, MAX_CONCURRENT
+from utils.async_runner import run_async
+from utils.rate_limiter import AsyncRateLimiter
 
 # 1. LLM 클라이언트 초기화 (공통 모듈 사용)
 client, MODEL_NAME = get_llm_client()
+# 실시간 호출용 비동기 클라이언트 (연결 풀을 재사용하는 공통 설정)
+# 재시도는 call_llm에서 직접 처리하므로 SDK 내부 재시도는 끔
+async_client = get_async_llm_client()[0].with_options(max_retries=0)
 print(f"✅ Using model: {MODEL_NAME} (Team 1)")
 
+MAX_RETRIES = 5  # 일시적 오류(429/연결 끊김·타임아웃/5xx) 재시도 횟수 (최대 6회 시도)
+RETRY_BACKOFF_MIN = 1.0  # 지수 백오프 최소 대기 시간 (초)
+RETRY_BACKOFF_MAX = 30.0  # 지수 백오프 최대 대기 시간 (초)
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, InternalServerError)  # APITimeoutError 포함
+rate_limiter = AsyncRateLimiter()  # x-ratelimit-* 헤더 기반 사전 속도 제한
+MAX_COMPLETION_TOKENS = 80  # 페르소나 1명당 출력 토큰 상한 (reasoning 1-2문장 기준)
+TRUNCATION_RETRY_FACTOR = 4  # 상한에 걸려 잘린 응답은 상한을 이 배수로 늘려 한 번 더 요청
+
+# =============================================================================
+# 1-1. 응답 스키마 (Structured Outputs)
+# =============================================================================
+
+class Verdict(BaseModel):
+    decision: Literal["YES", "NO"]
+    reasoning: str
+
+class PersonaVerdict(Verdict):
+    id: str
+
+class PackedVerdict(BaseModel):
+    results: list[PersonaVerdict]
+
+def _json_schema_format(model: type) -> dict:
+    """Batch API 요청 body용 strict json_schema response_format 생성"""
+    schema = model.model_json_schema()
+    for definition in [schema, *schema.get("$defs", {}).values()]:
+        definition["additionalProperties"] = False
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "schema": schema, "strict": True}
+    }
+
 # =============================================================================
 # 2. Prompt 생성
 # =============================================================================
 
-def create_static_zeroshot_prompt(persona: Persona) -> tuple:
-    persona_desc = f"""You are a {persona.age} year old {persona.gender} named '{persona.name}'.
-Occupation: {persona.occupation}
-[Gamer Type: {persona.gamer_type_name_display}]
-{persona.description}
+USER_PROMPT = "Is 'Cyberpunk 2077' worth buying? Will you buy it?"  # 모든 페르소나 공통 질문
 
-[Traits]
-- Spending Level: {persona.traits['spending_level']}
-- Information Seeking: {persona.traits['information_seeking']}"""
+@functools.lru_cache(maxsize=None)
+def _type_block(gamer_type: str) -> str:
+    """
+    게이머 유형별로 고정된 시스템 프롬프트 뒷부분 (유형당 한 번만 생성)
+    [Gamer Type]부터 [OUTPUT FORMAT]까지는 페르소나와 무관하므로 캐시하고,
+    페르소나별 필드는 create_static_zeroshot_prompt에서 원래 위치([ROLE] 바로 아래)에 붙임.
+    """
+    info = GAMER_TYPES[gamer_type]
+    return f"""[Gamer Type: {info['type_name_display']}]
+{info['description']}
 
-    system_prompt = f"""[ROLE]
-{persona_desc}
+[Traits]
+- Spending Level: {info['traits']['spending_level']}
+- Information Seeking: {info['traits']['information_seeking']}
 
 [INSTRUCTION]
 Make a decision based SOLELY on your 'traits' and 'prior knowledge' without any external information (news, bugs, reviews, etc.).
@@ -48,77 +96,330 @@ You MUST respond in the following JSON format:
     "decision": "YES" or "NO" (Purchase Intention),
     "reasoning": "A short reason (1-2 sentences)"
 }}"""
+
+def create_static_zeroshot_prompt(persona: Persona) -> tuple:
+    system_prompt = f"""[ROLE]
+You are a {persona.age} year old {persona.gender} named '{persona.name}'.
+Occupation: {persona.occupation}
+{_type_block(persona.gamer_type)}"""
     
-    user_prompt = "Is 'Cyberpunk 2077' worth buying? Will you buy it?"
-    
+    return system_prompt, USER_PROMPT
+
+def _persona_entry(persona) -> dict:
+    """묶음 프롬프트의 [PERSONAS]에 들어가는 페르소나 한 명의 항목"""
+    return {
+        "id": persona.id,
+        "name": persona.name,
+        "age": persona.age,
+        "gender": persona.gender,
+        "occupation": persona.occupation,
+        "gamer_type": persona.gamer_type_name_display,
+        "description": persona.description,
+        "spending_level": persona.traits['spending_level'],
+        "information_seeking": persona.traits['information_seeking']
+    }
+
+def create_batched_prompt(personas: list) -> tuple:
+    """여러 페르소나를 하나의 요청으로 묶는 프롬프트 (페르소나별 결과를 id로 구분)"""
+    persona_list = [_persona_entry(persona) for persona in personas]
+
+    system_prompt = """[ROLE]
+You will role-play each of the independent gamer personas listed by the user, one at a time.
+Each persona decides on its own; do not let one persona's answer influence another.
+
+[INSTRUCTION]
+For each persona, make a decision based SOLELY on that persona's 'traits' and 'prior knowledge' without any external information (news, bugs, reviews, etc.).
+Answer honestly based on each gamer persona.
+
+[OUTPUT FORMAT]
+You MUST respond in the following JSON format, with exactly one entry per persona:
+{
+    "results": [
+        {
+            "id": "<persona id>",
+            "decision": "YES" or "NO" (Purchase Intention),
+            "reasoning": "A short reason (1-2 sentences)"
+        }
+    ]
+}"""
+
+    user_prompt = f"""[PERSONAS]
+{json.dumps(persona_list, ensure_ascii=False, indent=2)}
+
+For each persona: Is 'Cyberpunk 2077' worth buying? Will you buy it?"""
+
     return system_prompt, user_prompt
 
 # =============================================================================
 # 3. API Call
 # =============================================================================
 
-def call_llm(system_prompt: str, user_prompt: str) -> dict:
-    try:
-        response = client.chat.completions.create(
-            model=MODEL_NAME, 
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=TEMPERATURE,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
-    except Exception as e:
-        print(f"  [ERROR] {e}")
-        return None
+def _backoff_delay(attempt: int) -> float:
+    """지수 백오프 + 랜덤 지터: [MIN, min(MAX, MIN * 2^attempt)] 구간에서 균등 추출"""
+    return random.uniform(RETRY_BACKOFF_MIN, min(RETRY_BACKOFF_MAX, RETRY_BACKOFF_MIN * 2 ** attempt))
+
+async def call_llm(system_prompt: str, user_prompt: str, semaphore: asyncio.Semaphore,
+                   response_format: type = Verdict,
+                   max_completion_tokens: int = MAX_COMPLETION_TOKENS) -> BaseModel:
+    """스키마(response_format)에 맞춰 파싱된 응답 객체 반환 (실패/거부 시 None)"""
+    attempt = 0  # 일시적 오류로 재시도한 횟수 (잘린 응답 재요청은 따로 한 번만 허용)
+    truncation_retried = False
+    async with semaphore:
+        while True:
+            await rate_limiter.wait()
+            try:
+                raw = await async_client.beta.chat.completions.with_raw_response.parse(
+                    model=MODEL_NAME, 
+                    messages=[
+                        {"role": "system", "content": system_prompt},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=TEMPERATURE,
+                    response_format=response_format,
+                    max_completion_tokens=max_completion_tokens
+                )
+                parsed = raw.parse().choices[0].message.parsed
+                # 응답을 먼저 확보한 뒤 헤더 반영 (헤더 문제로 성공한 응답을 버리지 않도록)
+                rate_limiter.update(raw.headers)
+                return parsed
+            except LengthFinishReasonError:
+                # 잘린 응답을 버리면 긴 답변을 하는 페르소나만 빠져 YES/NO 비율이 왜곡되므로 상한을 늘려 재요청
+                if truncation_retried:
+                    print(f"  [ERROR] Response truncated even at max_completion_tokens={max_completion_tokens}")
+                    return None
+                truncation_retried = True
+                max_completion_tokens *= TRUNCATION_RETRY_FACTOR
+                print(f"  [RETRY] Response truncated, retrying with max_completion_tokens={max_completion_tokens}")
+            except RETRYABLE_ERRORS as e:
+                if attempt == MAX_RETRIES:
+                    print(f"  [ERROR] Giving up after {attempt + 1} attempts: {type(e).__name__}: {e}")
+                    return None
+                delay = _backoff_delay(attempt)
+                if isinstance(e, RateLimitError):
+                    # Retry-After(없으면 백오프 시간)만큼 모든 요청을 멈춘 뒤 재시도
+                    delay = rate_limiter.backoff(e.response.headers, default=delay)
+                    print(f"  [429] Rate limited, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+                else:
+                    print(f"  [RETRY] {type(e).__name__}, retrying in {delay:.1f}s ({attempt + 1}/{MAX_RETRIES})")
+                    await asyncio.sleep(delay)
+                attempt += 1
+            except Exception as e:
+                print(f"  [ERROR] {e}")
+                return None
+
+async def call_llm_all(prompts: list, max_concurrent: int = MAX_CONCURRENT, **kwargs) -> list:
+    """모든 프롬프트를 동시에 호출 (Semaphore로 동시 요청 수 제한), 입력 순서대로 응답 반환"""
+    semaphore = asyncio.Semaphore(max_concurrent)
+    return await asyncio.gather(*(
+        call_llm(system_prompt, user_prompt, semaphore, **kwargs) for system_prompt, user_prompt in prompts
+    ))
+
+async def call_llm_as_completed(personas: list, prompts: list, on_result, max_concurrent: int = MAX_CONCURRENT):
+    """
+    모든 프롬프트를 동시에 호출하고, 응답이 도착하는 순서대로 on_result(persona, system_prompt, response) 호출
+    (결과를 모아두지 않으므로 도중에 중단되어도 이미 처리된 응답은 남음)
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    
+    async def call_one(persona, system_prompt, user_prompt):
+        return persona, system_prompt, await call_llm(system_prompt, user_prompt, semaphore)
+    
+    for next_result in asyncio.as_completed([
+        call_one(persona, system_prompt, user_prompt)
+        for persona, (system_prompt, user_prompt) in zip(personas, prompts)
+    ]):
+        on_result(*await next_result)
+
+# =============================================================================
+# 3-1. Batch API (모든 요청을 하나의 배치 작업으로 제출)
+# =============================================================================
+
+BATCH_POLL_INTERVAL = 30  # 배치 상태 확인 주기 (초)
+
+def build_batch_requests(personas: list, prompts: list) -> bytes:
+    """persona.id를 custom_id로 하는 Batch API 입력(JSONL) 생성"""
+    lines = []
+    for persona, (system_prompt, user_prompt) in zip(personas, prompts):
+        lines.append(json.dumps({
+            "custom_id": persona.id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": MODEL_NAME,
+                "messages": [
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                "temperature": TEMPERATURE,
+                "response_format": _json_schema_format(Verdict),
+                # 배치는 잘린 응답을 다시 요청할 수 없으므로 실시간 재요청과 같은 늘린 상한을 처음부터 사용
+                "max_completion_tokens": MAX_COMPLETION_TOKENS * TRUNCATION_RETRY_FACTOR
+            }
+        }, ensure_ascii=False))
+    return "\n".join(lines).encode("utf-8")
+
+def run_batch_job(personas: list, prompts: list) -> dict:
+    """
+    Batch API로 모든 프롬프트를 제출하고 완료될 때까지 대기
+    
+    Returns:
+        dict: persona.id -> 파싱된 응답(Verdict), 실패한 요청은 포함되지 않음
+    """
+    if USE_OLLAMA:
+        raise ValueError("Batch API는 OpenAI API에서만 사용할 수 있습니다 (USE_OLLAMA = False 필요).")
+    
+    input_file = client.files.create(
+        file=("team1_batch_input.jsonl", build_batch_requests(personas, prompts)),
+        purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    print(f"Batch submitted: {batch.id} ({len(prompts)} requests)")
+    
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(BATCH_POLL_INTERVAL)
+        batch = client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        print(f"  [{batch.status}] {counts.completed}/{counts.total} completed, {counts.failed} failed")
+    
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status '{batch.status}'")
+    
+    responses = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        try:
+            choice = item["response"]["body"]["choices"][0]
+            if choice.get("finish_reason") == "length":
+                print(f"  [ERROR] {item['custom_id']}: Response truncated at "
+                      f"max_completion_tokens={MAX_COMPLETION_TOKENS * TRUNCATION_RETRY_FACTOR}")
+                continue
+            responses[item["custom_id"]] = Verdict.model_validate_json(choice["message"]["content"])
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            print(f"  [ERROR] {item.get('custom_id')}: {e}")
+    return responses
 
 # =============================================================================
 # 4. Main Execution
 # =============================================================================
 
-def run_experiment_a_modular(n_agents: int = 100):
+def run_packed_requests(personas: list, personas_per_request: int) -> tuple:
+    """
+    personas_per_request명씩 묶어 요청하고 결과를 persona.id 기준으로 다시 펼침
+    
+    Returns:
+        tuple: (페르소나 순서의 프롬프트 리스트, 페르소나 순서의 응답 리스트)
+               프롬프트는 (묶음 공통 system 프롬프트, 해당 페르소나의 [PERSONAS] 항목 JSON) 튜플
+    """
+    groups = [personas[i:i + personas_per_request] for i in range(0, len(personas), personas_per_request)]
+    group_prompts = [create_batched_prompt(group) for group in groups]
+    print(f"Sending {len(group_prompts)} packed requests "
+          f"({personas_per_request} personas each, max concurrent: {MAX_CONCURRENT})...")
+    group_responses = run_async(call_llm_all(
+        group_prompts,
+        response_format=PackedVerdict,
+        max_completion_tokens=MAX_COMPLETION_TOKENS * personas_per_request
+    ))
+    
+    prompt_by_id = {}
+    response_by_id = {}
+    for group, group_prompt, group_response in zip(groups, group_prompts, group_responses):
+        for persona in group:
+            prompt_by_id[persona.id] = (
+                group_prompt[0],
+                json.dumps(_persona_entry(persona), ensure_ascii=False, indent=2)
+            )
+        if group_response is None:
+            continue
+        for item in group_response.results:
+            response_by_id[item.id] = item
+    
+    prompts = [prompt_by_id[persona.id] for persona in personas]
+    responses = [response_by_id.get(persona.id) for persona in personas]
+    return prompts, responses
+
+RESULT_COLUMNS = ["Agent_ID", "Name", "Gender", "Age_Group", "Persona_Type", "Decision", "Reasoning", "System_Prompt"]
+
+def run_experiment_a_modular(n_agents: int = 100, use_batch_api: bool = False, personas_per_request: int = 1):
     print("=" * 70)
     print(f"Task 1: Static Zero-Shot (Modularized English Version)")
     print("=" * 70)
     
     personas = generate_balanced_personas(n_per_type=13) 
-    results = []
+    total = len(personas)
+    
+    decision_counts = Counter()
+    failed = []
+    output_path = os.path.join(current_dir, "Team1_Static_ZeroShot_Results.csv")
     
-    for i, persona in enumerate(personas):
-        system_prompt, user_prompt = create_static_zeroshot_prompt(persona)
+    # 요청 전에 CSV를 열어 두고 응답이 도착할 때마다 한 행씩 기록
+    with open(output_path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS)
+        writer.writeheader()
         
-        print(f"[{i+1}/{len(personas)}] {persona.gamer_type_name_display}...", end=" ")
-        response = call_llm(system_prompt, user_prompt)
+        completed = 0
         
-        if response:
-            decision = response.get("decision", "NO").upper()
-            reason = response.get("reasoning", "")
-            print(f"-> {decision}")
-            
-            results.append({
+        def record(persona, system_prompt, response):
+            nonlocal completed
+            completed += 1
+            print(f"[{completed}/{total}] {persona.gamer_type_name_display}...", end=" ")
+            if not response:
+                failed.append(persona.id)
+                print("-> (no response)")
+                return
+            print(f"-> {response.decision}")
+            writer.writerow({
                 "Agent_ID": persona.id,
                 "Name": persona.name,
                 "Gender": persona.gender,
                 "Age_Group": persona.age_group,
                 "Persona_Type": persona.gamer_type_name_display,
-                "Decision": decision,
-                "Reasoning": reason,
+                "Decision": response.decision,
+                "Reasoning": response.reasoning,
                 "System_Prompt": system_prompt
             })
-        time.sleep(0.5)
+            f.flush()
+            decision_counts[response.decision] += 1
         
-    # 결과 저장
-    df = pd.DataFrame(results)
-
-    output_path = os.path.join(current_dir, "Team1_Static_ZeroShot_Results.csv")
-    df.to_csv(output_path, index=False, encoding="utf-8-sig")
+        if personas_per_request > 1:
+            prompts, responses = run_packed_requests(personas, personas_per_request)
+            # 공통 system 프롬프트만으로는 어떤 페르소나였는지 알 수 없으므로 해당 페르소나 항목을 함께 기록
+            for persona, (system_prompt, persona_entry), response in zip(personas, prompts, responses):
+                record(persona, f"{system_prompt}\n\n[PERSONA]\n{persona_entry}", response)
+        else:
+            prompts = [create_static_zeroshot_prompt(persona) for persona in personas]
+            if use_batch_api:
+                batch_responses = run_batch_job(personas, prompts)
+                for persona, (system_prompt, _) in zip(personas, prompts):
+                    record(persona, system_prompt, batch_responses.get(persona.id))
+            else:
+                print(f"Sending {len(prompts)} requests (max concurrent: {MAX_CONCURRENT})...")
+                run_async(call_llm_as_completed(personas, prompts, record))
     
     print("\n" + "=" * 70)
     print(f"결과 저장 경로: {output_path}")
-    print(df['Decision'].value_counts(normalize=True))
+    if failed:
+        print(f"⚠️ 응답 없음 {len(failed)}/{total}명 (결과에서 제외): {', '.join(failed)}")
+    answered = decision_counts.total()
+    print("Decision")
+    for decision, count in decision_counts.most_common():
+        print(f"{decision:<6} {count / answered:.3f}")
     print("=" * 70)
 
 if __name__ == "__main__":
-    run_experiment_a_modular()
+    parser = argparse.ArgumentParser(description="Team 1: Static Zero-Shot Simulation")
+    parser.add_argument("--batch", action="store_true", help="OpenAI Batch API로 실행 (최대 24시간 소요, 비용 50% 절감)")
+    parser.add_argument("--pack", type=int, default=1, help="요청 하나에 묶을 페르소나 수 (기본값 1: 페르소나별 개별 요청)")
+    args = parser.parse_args()
+    if args.pack < 1:
+        parser.error("--pack must be >= 1")
+    if args.batch and args.pack > 1:
+        parser.error("--batch and --pack cannot be combined")
+    
+    run_experiment_a_modular(use_batch_api=args.batch, personas_per_request=args.pack)
 
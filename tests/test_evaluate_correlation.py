@@ -0,0 +1,25 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evaluate_correlation import fast_pearson, pearson_corr
+
+
+def test_fast_pearson_constant_input_is_nan():
+    # Static 모델: 비율이 상수이므로 분산 0 -> NaN (반올림 잔차로 0 근처 값이 나오면 안 됨)
+    rng = np.random.default_rng(0)
+    x = np.full(1395, 0.4519)
+    y = rng.random(1395)
+    assert np.isnan(fast_pearson(x, y))
+    assert np.isnan(fast_pearson(y, x))
+    assert np.isnan(pearson_corr(x, y))
+
+
+def test_fast_pearson_matches_corrcoef():
+    rng = np.random.default_rng(1)
+    x = rng.random(500)
+    y = 0.3 * x + rng.random(500)
+    assert np.isclose(fast_pearson(x, y), np.corrcoef(x, y)[0, 1])
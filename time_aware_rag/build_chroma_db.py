@@ -5,6 +5,12 @@ from datetime import datetime
 import os
 import argparse
 import sys
+
+# 프로젝트 루트 경로 추가 (utils import를 위해)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.embedding_config import get_embedding_function, HNSW_CONFIG
+
 # torch는 로컬 모델 사용 시에만 필요 (조건부 import)
 try:
     import torch
@@ -102,8 +108,9 @@ def build_chroma_db(test_mode=False):
         print(f"Found local model at {MODEL_PATH}, using CustomEmbeddingFunction.")
         ef = CustomEmbeddingFunction(model_path=MODEL_PATH)
     else:
-        print(f"Warning: Local model not found at {MODEL_PATH}. Falling back to default {MODEL_NAME}.")
-        ef = embedding_functions.SentenceTransformerEmbeddingFunction(model_name="all-MiniLM-L6-v2")
+        print(f"Warning: Local model not found at {MODEL_PATH}. Falling back to the shared embedding model.")
+        # 검색 측(rag_modules)과 동일한 공통 임베딩 설정 사용
+        ef = get_embedding_function()
     
     # 스키마 초기화를 위해 항상 기존 컬렉션 삭제
     try:
@@ -112,7 +119,12 @@ def build_chroma_db(test_mode=False):
     except Exception as e:
         print(f"Collection deletion skipped: {e}")
 
-    collection = client.create_collection(name=COLLECTION_NAME, embedding_function=ef)
+    # static_rag 빌더와 같은 HNSW 설정(cosine 공간) 사용 -> 검색 측 similarity = 1 - distance
+    collection = client.create_collection(
+        name=COLLECTION_NAME,
+        embedding_function=ef,
+        metadata=HNSW_CONFIG
+    )
     
     df = process_reviews(CSV_PATH)
     
@@ -4,12 +4,12 @@ import sys
 import random
 import numpy as np
 import pandas as pd
-from chromadb.utils import embedding_functions
 
 # 프로젝트 루트 경로 추가 (모듈 import를 위해)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from utils.search_queries import GAMER_TYPE_QUERIES, GENERAL_QUERY
+from utils.embedding_config import get_embedding_function
 
 # ChromaDB 경로 및 컬렉션 설정
 CHROMA_DB_PATH = "datasets/chroma_db"
@@ -22,12 +22,6 @@ def get_chroma_client():
     client = chromadb.PersistentClient(path=CHROMA_DB_PATH)
     return client
 
-def get_embedding_function():
-    """SentenceTransformer 임베딩 함수 반환"""
-    return embedding_functions.SentenceTransformerEmbeddingFunction(
-        model_name="all-MiniLM-L6-v2"
-    )
-
 class RAGRetriever:
     def __init__(self):
         """RAGRetriever 초기화 및 컬렉션 로드"""
@@ -43,6 +37,23 @@ class RAGRetriever:
         except Exception as e:
             raise ValueError(f"컬렉션 '{COLLECTION_NAME}'을 로드하는 중 오류가 발생했습니다: {e}")
 
+        # 고정 쿼리(게이머 유형별 쿼리 + GENERAL_QUERY) 임베딩을 한 번의 배치 호출로 미리 계산
+        queries = list(dict.fromkeys(
+            [q for type_queries in GAMER_TYPE_QUERIES.values() for q in type_queries] + [GENERAL_QUERY]
+        ))
+        self._query_emb = dict(zip(queries, self.embedding_fn(queries)))
+        print(f"Precomputed embeddings for {len(self._query_emb)} queries.")
+
+    def get_query_embeddings(self, query_texts):
+        """
+        여러 쿼리의 임베딩을 입력 순서대로 반환합니다.
+        캐시에 없는 쿼리들만 모아 임베딩 함수를 한 번만 호출합니다.
+        """
+        misses = [q for q in dict.fromkeys(query_texts) if q not in self._query_emb]
+        if misses:
+            self._query_emb.update(zip(misses, self.embedding_fn(misses)))
+        return [np.asarray(self._query_emb[q], dtype=np.float32).tolist() for q in query_texts]
+
     # ===========================================================
     # 핵심 차별점: Time-Aware Weighted Score 적용
     # ===========================================================
@@ -93,18 +104,21 @@ class RAGRetriever:
         candidate_pool = []
 
         # 각 쿼리마다 넓은 후보 풀 검색 (Team 2는 top_k만, Team 3는 100개)
-        for query in selected_queries:
-            results = self.collection.query(
-                query_texts=[query],
-                n_results=300,  # 넓은 풀에서 검색 (Team 2와의 차이점)
-                include=["documents", "metadatas", "distances"],
-                where={"date": {"$lte": current_date_int}}  # 현재 날짜 이전 리뷰만 (date 필드 사용)
-            )
-
-            if results['documents'] and results['documents'][0]:
-                for doc, meta, dist in zip(results['documents'][0], results['metadatas'][0], results['distances'][0]):
+        # 모든 쿼리를 미리 계산된 임베딩으로 한 번에 검색
+        results = self.collection.query(
+            query_embeddings=self.get_query_embeddings(selected_queries),
+            n_results=300,  # 넓은 풀에서 검색 (Team 2와의 차이점)
+            include=["documents", "metadatas", "distances"],
+            where={"date": {"$lte": current_date_int}}  # 현재 날짜 이전 리뷰만 (date 필드 사용)
+        )
+
+        # documents[i], metadatas[i], distances[i]는 i번째 쿼리의 결과 리스트
+        for docs, metas, dists in zip(results['documents'] or [], results['metadatas'] or [], results['distances'] or []):
+            if docs:
+                for doc, meta, dist in zip(docs, metas, dists):
                     # Cosine similarity 계산 (Team 2와 동일)
-                    # ChromaDB의 distance는 cosine distance이므로 similarity = 1 - distance
+                    # 컬렉션은 cosine 공간(utils.embedding_config.HNSW_CONFIG)으로 구축되므로
+                    # distance = 1 - cosine similarity -> similarity = 1 - distance
                     similarity = max(0, 1 - dist)
                     
                     # 시간 차이 계산 (일 단위)
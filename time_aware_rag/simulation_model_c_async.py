@@ -10,7 +10,6 @@ import json
 import pandas as pd
 import random
 import asyncio
-from openai import AsyncOpenAI
 
 # 프로젝트 루트 경로 추가
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,7 +18,8 @@ sys.path.append(parent_dir)
 
 from utils.persona_generator import generate_balanced_personas, Persona
 from utils.search_queries import GAMER_TYPE_QUERIES, GENERAL_QUERY
-from utils.llm_config import get_llm_client, TEMPERATURE
+from utils.llm_config import get_async_llm_client, TEMPERATURE, MAX_CONCURRENT
+from utils.async_runner import run_async
 from time_aware_rag.rag_modules import RAGRetriever
 
 # 병렬 토크나이저 경고 억제
@@ -28,21 +28,7 @@ os.environ["TOKENIZERS_PARALLELISM"] = "false"
 # 병렬 토크나이저 경고 억제
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
 
-# Async OpenAI 클라이언트 초기화
-def get_async_llm_client():
-    """비동기 LLM 클라이언트 반환"""
-    import os
-    from dotenv import load_dotenv
-    
-    load_dotenv()
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise ValueError("OPENAI_API_KEY not found in .env file.")
-    
-    client = AsyncOpenAI(api_key=api_key)
-    model_name = "gpt-4o-mini"
-    return client, model_name
-
+# Async OpenAI 클라이언트 초기화 (공통 모듈 사용, 연결 풀 재사용)
 client, MODEL_NAME = get_async_llm_client()
 print(f"✅ Using model: {MODEL_NAME} (Team 3 - Async)")
 
@@ -84,7 +70,7 @@ JSON only:
 # 3. 비동기 API 호출
 # =============================================================================
 
-async def call_llm_async(client: AsyncOpenAI, prompt: str, semaphore: asyncio.Semaphore) -> dict:
+async def call_llm_async(client, prompt: str, semaphore: asyncio.Semaphore) -> dict:
     """비동기 LLM 호출 (동시 실행 수 제한, 재시도 포함)"""
     async with semaphore:
         for attempt in range(3):
@@ -270,7 +256,7 @@ async def run_experiment_c_rag_async(n_per_type: int = 13, max_concurrent: int =
 
 def main():
     """메인 함수"""
-    asyncio.run(run_experiment_c_rag_async(n_per_type=13, max_concurrent=20))
+    run_async(run_experiment_c_rag_async(n_per_type=13, max_concurrent=MAX_CONCURRENT))
 
 if __name__ == "__main__":
     main()
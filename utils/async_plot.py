@@ -0,0 +1,53 @@
+"""
+비동기 그래프 저장 모듈
+plt.savefig를 별도 프로세스에서 실행하여 메인 스크립트가 PNG 인코딩을 기다리지 않도록 함
+"""
+import sys
+import multiprocessing as mp
+import matplotlib
+import matplotlib.pyplot as plt
+
+# Agg 렌더러가 긴 선(path)을 나누어 처리하도록 설정
+matplotlib.rcParams['agg.path.chunksize'] = 10000
+
+
+class AsyncPlotter:
+    """
+    Figure를 자식 프로세스에서 저장하는 헬퍼
+
+    fork는 Linux에서만 사용합니다. Windows는 fork가 없고, macOS는 시스템 프레임워크
+    (macosx 백엔드, pyarrow 스레드 풀 등)가 시작된 뒤 fork하면 자식이 비정상 종료될 수 있어
+    Python 기본값도 spawn이므로, 그 외 플랫폼에서는 동기 저장으로 대체합니다.
+    """
+
+    def __init__(self):
+        self.processes = []
+        if sys.platform.startswith("linux"):
+            self.ctx = mp.get_context("fork")
+        else:
+            self.ctx = None
+
+    @staticmethod
+    def _save(fig, path, kwargs):
+        fig.savefig(path, **kwargs)
+        plt.close(fig)
+
+    def save(self, fig, path, **kwargs):
+        """fig를 path에 저장 (kwargs는 savefig로 전달)"""
+        if self.ctx is None:
+            self._save(fig, path, kwargs)
+            return
+        p = self.ctx.Process(target=self._save, args=(fig, path, kwargs))
+        p.start()
+        self.processes.append(p)
+
+    def join(self):
+        """진행 중인 모든 저장 작업이 끝날 때까지 대기"""
+        failed = []
+        for p in self.processes:
+            p.join()
+            if p.exitcode != 0:
+                failed.append(p.exitcode)
+        self.processes = []
+        if failed:
+            raise RuntimeError(f"그래프 저장 프로세스 실패 (exit codes: {failed})")
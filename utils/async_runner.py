@@ -0,0 +1,27 @@
+"""
+비동기 실행 헬퍼 모듈
+uvloop이 설치되어 있으면 uvloop 이벤트 루프로, 없으면 기본 asyncio 루프로 코루틴을 실행
+(전역 이벤트 루프 정책은 바꾸지 않으므로 모듈을 import만 해서는 아무 영향이 없음)
+"""
+import asyncio
+
+# uvloop은 선택 사항 (Linux/macOS 전용)
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+
+def run_async(coro):
+    """
+    코루틴을 실행하고 결과를 반환 (asyncio.run 대체)
+
+    Args:
+        coro: 실행할 코루틴
+
+    Returns:
+        코루틴의 반환값
+    """
+    if uvloop is not None:
+        return uvloop.run(coro)
+    return asyncio.run(coro)
@@ -0,0 +1,62 @@
+"""
+공통 임베딩 설정 모듈
+ChromaDB 구축(build_chroma_db)과 검색(rag_modules)이 동일한 임베딩 모델을 사용하도록 보장
+"""
+import platform
+from chromadb.utils import embedding_functions
+
+# =============================================================================
+# 임베딩 설정
+# =============================================================================
+
+# 로컬 SentenceTransformer 모델 (API 호출/비용 없음)
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+
+# True로 변경하면 ONNX Runtime + int8 동적 양자화 모델 사용 (CPU 처리량 향상)
+# - sentence-transformers>=3.2, onnxruntime(optimum[onnxruntime]) 필요
+# - 벡터 값이 달라지므로 변경 후에는 반드시 ChromaDB를 다시 구축해야 함
+# - 양자화 파일은 CPU 아키텍처별로 다르며 구축/검색은 같은 파일을 사용해야 함
+USE_ONNX_INT8 = False
+
+# None이면 실행 중인 CPU에 맞는 파일을 자동 선택
+# (ARM64: model_qint8_arm64.onnx, x86-64: AVX2 이상이면 동작하는 model_quint8_avx2.onnx)
+# AVX-512 VNNI를 지원하는 CPU라면 "onnx/model_qint8_avx512_vnni.onnx"로 지정하면 더 빠름
+ONNX_INT8_FILE = None
+
+def get_onnx_int8_file():
+    """사용할 ONNX int8 모델 파일 경로 반환 (ONNX_INT8_FILE이 None이면 CPU 아키텍처로 선택)"""
+    if ONNX_INT8_FILE:
+        return ONNX_INT8_FILE
+    if platform.machine().lower() in ("arm64", "aarch64"):
+        return "onnx/model_qint8_arm64.onnx"
+    return "onnx/model_quint8_avx2.onnx"
+
+# ChromaDB HNSW 인덱스 설정 (static_rag / time_aware_rag 빌더 공통)
+# 두 빌더가 같은 컬렉션(cyberpunk2077_reviews)을 만들므로 거리 공간을 반드시 통일
+# cosine 공간에서 distance = 1 - cosine similarity
+HNSW_CONFIG = {"hnsw:space": "cosine", "hnsw:M": 16, "hnsw:construction_ef": 200}
+
+# =============================================================================
+# 임베딩 함수 초기화
+# =============================================================================
+
+def get_embedding_function():
+    """
+    임베딩 함수 반환 (구축/검색 공통)
+
+    Returns:
+        embedding_functions.SentenceTransformerEmbeddingFunction: 임베딩 함수 객체
+    """
+    if USE_ONNX_INT8:
+        onnx_file = get_onnx_int8_file()
+        print(f"🔹 Using embedding model: {EMBEDDING_MODEL_NAME} (ONNX int8: {onnx_file})")
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=EMBEDDING_MODEL_NAME,
+            backend="onnx",
+            model_kwargs={"file_name": onnx_file}
+        )
+
+    print(f"🔸 Using embedding model: {EMBEDDING_MODEL_NAME}")
+    return embedding_functions.SentenceTransformerEmbeddingFunction(
+        model_name=EMBEDDING_MODEL_NAME
+    )
@@ -3,9 +3,17 @@
 모든 팀(Team 1, 2, 3)이 동일한 LLM을 사용하도록 보장
 """
 import os
-from openai import OpenAI
+import httpx
+from openai import OpenAI, AsyncOpenAI, DefaultAsyncHttpxClient
 from dotenv import load_dotenv
 
+# HTTP/2는 h2 패키지가 설치된 경우에만 사용 (pip install "httpx[http2]")
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 # 환경 변수 로드
 load_dotenv()
 
@@ -26,6 +34,31 @@ OPENAI_MODEL = "gpt-4o-mini"  # 모든 팀이 동일한 모델 사용
 # Temperature 설정 (모든 팀 공통)
 TEMPERATURE = 0.5
 
+# 동시 LLM 요청 수 (모든 팀 공통)
+# I/O 대기 작업이므로 CPU 코어 수가 아니라 API 계정의 RPM/TPM 한도에 맞춰 조정
+# .env 또는 환경 변수 OPENAI_MAX_CONCURRENT로 변경 가능
+def _get_max_concurrent():
+    """OPENAI_MAX_CONCURRENT를 읽어 반환 (1 이상의 정수가 아니면 ValueError)"""
+    value = os.getenv("OPENAI_MAX_CONCURRENT") or "20"
+    try:
+        max_concurrent = int(value)
+    except ValueError:
+        max_concurrent = 0
+    if max_concurrent < 1:
+        # 0이면 Semaphore가 요청을 하나도 통과시키지 않아 멈추고, 음수면 Semaphore 생성 시 오류
+        raise ValueError(
+            f"OPENAI_MAX_CONCURRENT must be an integer >= 1 (got '{value}'). "
+            "Fix or remove it in your .env file."
+        )
+    return max_concurrent
+
+MAX_CONCURRENT = _get_max_concurrent()
+
+# 비동기 클라이언트 HTTP 연결 풀 설정
+# 동시 요청이 keep-alive 연결을 재사용하도록 하여 요청마다 TCP/TLS 연결을 새로 맺지 않음
+HTTP_MAX_CONNECTIONS = 200
+HTTP_KEEPALIVE_EXPIRY = 60  # 초
+
 # =============================================================================
 # LLM 클라이언트 초기화
 # =============================================================================
@@ -47,13 +80,7 @@ def get_llm_client():
         model_name = OLLAMA_MODEL
     else:
         print(f"🔸 Using OpenAI API: {OPENAI_MODEL}")
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise ValueError(
-                "OPENAI_API_KEY not found in .env file. "
-                "Please create a .env file with: OPENAI_API_KEY=your_key_here"
-            )
-        client = OpenAI(api_key=api_key)
+        client = OpenAI(api_key=_get_openai_api_key())
         model_name = OPENAI_MODEL
     
     return client, model_name
@@ -75,3 +102,38 @@ def get_model_name():
         _, _model_name = get_llm_client()
     return _model_name
 
+def get_async_llm_client():
+    """
+    비동기 LLM 클라이언트 반환 (모든 팀 공통)
+    keep-alive 연결 풀(및 가능하면 HTTP/2)을 설정한 httpx 클라이언트를 사용합니다.
+    
+    Returns:
+        AsyncOpenAI: 비동기 OpenAI 클라이언트 객체
+        str: 사용 중인 모델 이름
+    """
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_CONNECTIONS,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=HTTP2_AVAILABLE
+    )
+    if USE_OLLAMA:
+        client = AsyncOpenAI(base_url=OLLAMA_BASE_URL, api_key="ollama", http_client=http_client)
+        model_name = OLLAMA_MODEL
+    else:
+        client = AsyncOpenAI(api_key=_get_openai_api_key(), http_client=http_client)
+        model_name = OPENAI_MODEL
+    
+    return client, model_name
+
+def _get_openai_api_key():
+    """.env에서 OPENAI_API_KEY를 읽어 반환 (없으면 ValueError)"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise ValueError(
+            "OPENAI_API_KEY not found in .env file. "
+            "Please create a .env file with: OPENAI_API_KEY=your_key_here"
+        )
+    return api_key
@@ -1,4 +1,5 @@
 import random
+import numpy as np
 from typing import List, Dict, Tuple, Optional
 from dataclasses import dataclass
 
@@ -87,7 +88,7 @@ OCCUPATIONS_BY_AGE = {
     "60+": ["Retiree", "Business Owner", "Homemaker"]
 }
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Persona:
     id: str
     name: str
@@ -105,10 +106,11 @@ def generate_english_name(gender: str) -> str:
     given_name = random.choice(ENGLISH_MALE_NAMES) if gender == "Male" else random.choice(ENGLISH_FEMALE_NAMES)
     return f"{given_name} {surname}"
 
+AGE_RANGES = {"18-19": (18, 19), "20-29": (20, 29), "30-39": (30, 39), "40-49": (40, 49), "50-59": (50, 59), "60+": (60, 70)}
+
 def sample_age() -> Tuple[str, int]:
     age_group = random.choices(list(AGE_DISTRIBUTION.keys()), weights=list(AGE_DISTRIBUTION.values()))[0]
-    ranges = {"18-19": (18, 19), "20-29": (20, 29), "30-39": (30, 39), "40-49": (40, 49), "50-59": (50, 59), "60+": (60, 70)}
-    return age_group, random.randint(*ranges[age_group])
+    return age_group, random.randint(*AGE_RANGES[age_group])
 
 def generate_persona(persona_id: str, gamer_type: Optional[str] = None) -> Persona:
     gender = random.choices(["Male", "Female"], weights=[0.54, 0.46])[0]
@@ -134,11 +136,41 @@ def generate_persona(persona_id: str, gamer_type: Optional[str] = None) -> Perso
         description=info["description"]
     )
 
-def generate_balanced_personas(n_per_type: int = 13) -> List[Persona]:
-    personas = []
-    for gamer_type in GAMER_TYPES.keys():
-        for i in range(n_per_type):
-            persona_id = f"{gamer_type}_{i+1}"
-            personas.append(generate_persona(persona_id, gamer_type=gamer_type))
-    return personas
+def generate_balanced_personas(n_per_type: int = 13, seed: Optional[int] = None) -> List[Persona]:
+    # 속성별로 전체 인원을 한 번에 샘플링 (seed 지정 시 재현 가능)
+    rng = np.random.default_rng(seed)
+    gamer_types = np.repeat(list(GAMER_TYPES.keys()), n_per_type)
+    type_indices = np.tile(np.arange(1, n_per_type + 1), len(GAMER_TYPES))
+    n = len(gamer_types)
+
+    genders = rng.choice(list(GENDER_DISTRIBUTION.keys()), size=n, p=list(GENDER_DISTRIBUTION.values()))
+    age_groups = rng.choice(list(AGE_DISTRIBUTION.keys()), size=n, p=list(AGE_DISTRIBUTION.values()))
+
+    age_lows = np.array([AGE_RANGES[g][0] for g in age_groups])
+    age_highs = np.array([AGE_RANGES[g][1] for g in age_groups])
+    ages = rng.integers(age_lows, age_highs + 1)
+
+    is_male = genders == "Male"
+    given_idx = rng.integers(0, np.where(is_male, len(ENGLISH_MALE_NAMES), len(ENGLISH_FEMALE_NAMES)))
+    surname_idx = rng.integers(0, len(ENGLISH_SURNAMES), size=n)
+    occupation_idx = rng.integers(0, np.array([len(OCCUPATIONS_BY_AGE[g]) for g in age_groups]))
+
+    return [
+        Persona(
+            id=f"{gamer_type}_{i}",
+            name=f"{(ENGLISH_MALE_NAMES if gender == 'Male' else ENGLISH_FEMALE_NAMES)[g_idx]} {ENGLISH_SURNAMES[s_idx]}",
+            gender=gender,
+            age=age,
+            age_group=age_group,
+            occupation=OCCUPATIONS_BY_AGE[age_group][o_idx],
+            gamer_type=gamer_type,
+            gamer_type_name_display=GAMER_TYPES[gamer_type]["type_name_display"],
+            traits=GAMER_TYPES[gamer_type]["traits"],
+            description=GAMER_TYPES[gamer_type]["description"]
+        )
+        for gamer_type, i, gender, age_group, age, g_idx, s_idx, o_idx in zip(
+            gamer_types.tolist(), type_indices.tolist(), genders.tolist(), age_groups.tolist(),
+            ages.tolist(), given_idx.tolist(), surname_idx.tolist(), occupation_idx.tolist()
+        )
+    ]
 
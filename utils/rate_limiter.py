@@ -0,0 +1,74 @@
+"""
+응답 헤더 기반 속도 제한 모듈
+OpenAI 응답의 x-ratelimit-* 헤더를 읽어 한도에 가까워졌을 때만 요청을 늦춤
+(고정 time.sleep 대신 사용, 헤더가 없는 Ollama 등에서는 아무 동작도 하지 않음)
+"""
+import asyncio
+import re
+import time
+
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+
+
+def parse_reset_duration(value):
+    """'1s', '6m0s', '59.5ms' 형식의 리셋 시간을 초 단위로 변환 (없거나 해석 불가 시 None)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    parts = _DURATION_PATTERN.findall(str(value))
+    if not parts:
+        return None
+    return sum(float(num) * _DURATION_UNITS[unit] for num, unit in parts)
+
+
+def _parse_remaining(value):
+    """x-ratelimit-remaining-* 헤더 값을 정수로 변환 (없거나 해석 불가 시 None)"""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class AsyncRateLimiter:
+    """
+    남은 요청/토큰 수가 임계값 이하로 떨어지면 리셋 시점까지 새 요청을 대기시키는 제한기
+
+    Args:
+        min_remaining_requests (int): 이 값 이하로 남으면 대기
+        min_remaining_tokens (int): 이 값 이하로 남으면 대기
+    """
+
+    def __init__(self, min_remaining_requests: int = 1, min_remaining_tokens: int = 2000):
+        self.min_remaining_requests = min_remaining_requests
+        self.min_remaining_tokens = min_remaining_tokens
+        self._resume_at = 0.0
+
+    def _pause(self, seconds):
+        if seconds is not None and seconds > 0:
+            self._resume_at = max(self._resume_at, time.monotonic() + seconds)
+
+    async def wait(self):
+        """요청 전에 호출: 일시 정지 중이면 재개 시점까지 대기"""
+        delay = self._resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def update(self, headers):
+        """응답 헤더로 남은 한도를 확인하고 필요하면 일시 정지 (헤더가 없거나 잘못된 형식이면 무시)"""
+        remaining_requests = _parse_remaining(headers.get("x-ratelimit-remaining-requests"))
+        if remaining_requests is not None and remaining_requests <= self.min_remaining_requests:
+            self._pause(parse_reset_duration(headers.get("x-ratelimit-reset-requests")))
+
+        remaining_tokens = _parse_remaining(headers.get("x-ratelimit-remaining-tokens"))
+        if remaining_tokens is not None and remaining_tokens <= self.min_remaining_tokens:
+            self._pause(parse_reset_duration(headers.get("x-ratelimit-reset-tokens")))
+
+    def backoff(self, headers, default: float = 1.0) -> float:
+        """429 응답 시 호출: Retry-After 헤더(없으면 default초)만큼 일시 정지하고 대기 시간 반환"""
+        delay = parse_reset_duration(headers.get("retry-after") if headers is not None else None) or default
+        self._pause(delay)
+        return delay